@@ -73,6 +73,77 @@ def least_squares(y, tx):
     return w, loss
 
 
+def sketched_least_squares(y, tx, lambda_=0, sketch_size=None, tol=1e-14, max_iters=100, seed=1):
+    """Least squares (ridge regression for lambda_ > 0, same penalty as ridge_regression) without normal equations.
+    tx is sketched with a sparse sign embedding, the R factor of the sketch preconditions LSQR on the original
+    problem, so the iterations converge in a number of passes independent of the condition number of tx."""
+
+    num_row, num_col = tx.shape
+    if sketch_size is None:
+        sketch_size = 8 * num_col
+    damp = np.sqrt(2 * num_row * lambda_)
+    # the ridge term adds the rows damp * I to tx, they are small enough to be appended without sketching
+    sketch = np.r_[sparse_sign_sketch(tx, sketch_size, seed=seed), damp * np.identity(num_col)]
+    r = np.linalg.qr(sketch, mode='r')
+
+    # LSQR (Paige and Saunders) on the augmented problem [tx; damp*I] @ R^-1 @ z = [y; 0], w = R^-1 @ z,
+    # R^-1 and R^-T are applied by triangular solves
+    def matvec(v):
+        w = solve_triangular(r, v)
+        return tx @ w, damp * w
+
+    def rmatvec(u, u_damp):
+        return solve_triangular(r, tx.T @ u + damp * u_damp, trans=True)
+
+    u, u_damp = y.astype(float), np.zeros(num_col)
+    beta = bnorm = np.sqrt(u @ u)
+    if beta == 0:
+        # y = 0 gives w = 0
+        return np.zeros(num_col), compute_mse(y, tx, np.zeros(num_col))
+    u, u_damp = u / beta, u_damp / beta
+    v = rmatvec(u, u_damp)
+    alpha = np.linalg.norm(v)
+    if alpha == 0:
+        # y is orthogonal to the columns of tx, w = 0 is the solution
+        return np.zeros(num_col), compute_mse(y, tx, np.zeros(num_col))
+    v = v / alpha
+    z = np.zeros(num_col)
+    direction = v
+    phibar, rhobar = beta, alpha
+    anorm = 0
+
+    for n_iter in range(max_iters):
+        av, av_damp = matvec(v)
+        u, u_damp = av - alpha * u, av_damp - alpha * u_damp
+        beta = np.sqrt(u @ u + u_damp @ u_damp)
+        if beta > 0:
+            u, u_damp = u / beta, u_damp / beta
+        anorm = np.sqrt(anorm**2 + alpha**2 + beta**2)
+        v = rmatvec(u, u_damp) - beta * v
+        alpha = np.linalg.norm(v)
+        if alpha > 0:
+            v = v / alpha
+
+        rho = np.hypot(rhobar, beta)
+        c, s = rhobar / rho, beta / rho
+        theta = s * alpha
+        rhobar = -c * alpha
+        phi = c * phibar
+        phibar = s * phibar
+        z = z + (phi / rho) * direction
+        direction = v - (theta / rho) * direction
+
+        # stop once the residual is (numerically) orthogonal to the preconditioned range
+        arnorm = alpha * abs(s * phi)
+        if arnorm <= tol * anorm * phibar or phibar <= tol * bnorm:
+            break
+
+    w = solve_triangular(r, z)
+    loss = compute_mse(y, tx, w)
+
+    return w, loss
+
+
 # ==== Logistic Regression and its variants ====
 def logistic_sigmoid ( x ):
     large_number = 1e2
@@ -0,0 +1,96 @@
+# Latency/throughput benchmark for the local scoring service (proj1_server.py), runs entirely on localhost.
+#
+# Usage: python proj1_bench.py --model model.npz                  (starts an in-process server)
+#        python proj1_bench.py --port 8000 | --unix /tmp/proj1.sock  (uses a running server)
+import argparse
+import asyncio
+import json
+import time
+import numpy as np
+from proj1_model import load_model
+from proj1_server import ScoringServer, read_http_message
+
+
+async def open_connection(port, unix_path):
+    if unix_path is not None:
+        return await asyncio.open_unix_connection(unix_path)
+    return await asyncio.open_connection("127.0.0.1", port)
+
+
+async def request(reader, writer, method, path, payload=None):
+    """Send one HTTP request over a keep-alive connection, return (status, decoded json body)"""
+    body = b"" if payload is None else json.dumps(payload).encode()
+    writer.write("{m} {p} HTTP/1.1\r\nHost: localhost\r\nContent-Type: application/json\r\nContent-Length: {n}\r\n\r\n"
+                 .format(m=method, p=path, n=len(body)).encode() + body)
+    await writer.drain()
+    status_line, _, response = await read_http_message(reader)
+    return int(status_line.split(" ")[1]), json.loads(response)
+
+
+async def worker(port, unix_path, batches, latencies):
+    reader, writer = await open_connection(port, unix_path)
+    try:
+        for inputs in batches:
+            start = time.perf_counter()
+            status, response = await request(reader, writer, "POST", "/predict", {"inputs": inputs})
+            latencies.append(time.perf_counter() - start)
+            if status != 200:
+                raise RuntimeError(response["error"])
+    finally:
+        writer.close()
+
+
+async def benchmark(port, unix_path, concurrency, n_requests, rows_per_request, seed=1):
+    """Send n_requests requests of rows_per_request random events from concurrency connections,
+    return the latencies (in seconds) and the total wall time"""
+    reader, writer = await open_connection(port, unix_path)
+    _, health = await request(reader, writer, "GET", "/health")
+    writer.close()
+
+    np.random.seed(seed)
+    payloads = [np.random.randn(rows_per_request, health["n_inputs"]).tolist() for _ in range(n_requests)]
+    latencies = []
+    start = time.perf_counter()
+    await asyncio.gather(*[worker(port, unix_path, payloads[c::concurrency], latencies)
+                           for c in range(concurrency)])
+    return np.array(latencies), time.perf_counter() - start
+
+
+def print_report(latencies, total_time, rows_per_request):
+    print("requests: {n}, wall time: {t:.3f}s".format(n=len(latencies), t=total_time))
+    print("throughput: {r:.1f} requests/s, {e:.1f} events/s".format(
+          r=len(latencies) / total_time, e=len(latencies) * rows_per_request / total_time))
+    p50, p90, p99 = np.percentile(latencies, [50, 90, 99]) * 1000
+    print("latency (ms): p50={a:.2f} p90={b:.2f} p99={c:.2f} max={d:.2f}".format(
+          a=p50, b=p90, c=p99, d=latencies.max() * 1000))
+
+
+async def main(args):
+    server = None
+    port, unix_path = args.port, args.unix
+    if args.model is not None:
+        server = ScoringServer(load_model(args.model), args.max_batch_size, args.max_delay_ms / 1000)
+        await server.start("127.0.0.1", 0 if unix_path is None else None, unix_path)
+        if unix_path is None:
+            port = server.server.sockets[0].getsockname()[1]
+    try:
+        latencies, total_time = await benchmark(port, unix_path, args.concurrency, args.requests, args.rows)
+    finally:
+        if server is not None:
+            await server.close()
+    print_report(latencies, total_time, args.rows)
+    if server is not None:
+        print("mean batch size: {b:.1f} events".format(b=np.mean(server.batcher.batch_sizes)))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the local scoring service")
+    parser.add_argument("--model", default=None, help="start an in-process server for this model file")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--unix", default=None, help="connect through this Unix socket path instead of TCP")
+    parser.add_argument("--concurrency", type=int, default=32, help="number of concurrent connections")
+    parser.add_argument("--requests", type=int, default=2000, help="total number of requests")
+    parser.add_argument("--rows", type=int, default=1, help="events per request")
+    parser.add_argument("--max-batch-size", type=int, default=4096, help="in-process server batch size")
+    parser.add_argument("--max-delay-ms", type=float, default=2.0, help="in-process server batch delay")
+    asyncio.run(main(parser.parse_args()))
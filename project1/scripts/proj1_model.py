@@ -0,0 +1,44 @@
+# Model artifact: save a trained model and score new events without the training code
+import numpy as np
+from proj1_helpers import predict_labels
+from proj1_preprocessing import apply_preprocessing
+from proj1_utils import build_poly_plus
+
+MODEL_FORMAT_VERSION = 1
+
+
+def save_model(path, w, feature_list, degree, stats, n_inputs):
+    """Save the weights, selected features, polynomial degree and preprocessing statistics
+    (as returned by load_clean_csv with return_stats=True) to a compressed .npz file.
+    Only the statistics of the selected features are kept, n_inputs is the number of raw input columns"""
+    feature_list = np.asarray(feature_list, dtype=np.int64)
+    arrays = {}
+    for key in ("fill", "mean", "std"):
+        # an empty array marks a preprocessing step that was not applied
+        value = stats.get(key)
+        arrays[key] = np.empty(0) if value is None else np.asarray(value, dtype=float)[feature_list]
+    np.savez_compressed(path, format_version=MODEL_FORMAT_VERSION, w=np.asarray(w, dtype=float),
+                        feature_list=feature_list, degree=int(degree), n_inputs=int(n_inputs), **arrays)
+
+
+def load_model(path):
+    """Load a model saved by save_model, return a dict with the model fields"""
+    with np.load(path, allow_pickle=False) as data:
+        version = int(data["format_version"])
+        if version != MODEL_FORMAT_VERSION:
+            raise ValueError('Unsupported model format version {v}'.format(v=version))
+        model = {"w": data["w"], "feature_list": data["feature_list"],
+                 "degree": int(data["degree"]), "n_inputs": int(data["n_inputs"])}
+        for key in ("fill", "mean", "std"):
+            model[key] = data[key] if data[key].size else None
+    return model
+
+
+def score_model(model, inputs):
+    """Return the predicted labels (-1,1) of raw inputs (one event per row, missing values denoted by -999)"""
+    inputs = np.atleast_2d(np.asarray(inputs, dtype=float))
+    if inputs.shape[1] != model["n_inputs"]:
+        raise ValueError('Expected {e} input columns, got {g}'.format(e=model["n_inputs"], g=inputs.shape[1]))
+    x = apply_preprocessing(inputs[:, model["feature_list"]], model["fill"], model["mean"], model["std"])
+    tx = build_poly_plus(x, model["degree"])
+    return predict_labels(model["w"], tx)
@@ -10,22 +10,27 @@ def get_missing_index(input_data):
     return missing_ind 
 
 
-def load_clean_csv(data_path, sub_sample=False, missing_val="ignore", normalized=True): 
+def load_clean_csv(data_path, sub_sample=False, missing_val="ignore", normalized=True, return_stats=False): 
     """Load clean csv, specify data_path, sub_sample(True/False), missing_val(ignore, avg, median), normalized(True/False)
-    Return yb, input_data, and ids"""
+    Return yb, input_data, and ids, followed by the preprocessing statistics if return_stats is True.
+    The statistics (a dict with the fill values and the normalization mean and std per column) allow
+    applying the same preprocessing to unseen data, see apply_preprocessing"""
     yb, input_data, ids = load_csv_data(data_path, sub_sample)
     missing_ind = get_missing_index(input_data)
     
     incomplete_features = np.unique(np.where(input_data == -999.0)[1])
+    stats = {"fill": None, "mean": None, "std": None}
     
     if (missing_val=="avg"): 
         mean = np.mean(input_data[~missing_ind], 0)
         for i in incomplete_features:
             np.place(input_data[:,i], input_data[:,i] == -999, mean[i])
+        stats["fill"] = mean
     elif (missing_val=="median"): 
         median = np.median(input_data[~missing_ind], 0)
         for i in incomplete_features:
             np.place(input_data[:,i], input_data[:,i] == -999, median[i])
+        stats["fill"] = median
     else:  
         yb = yb[~missing_ind]
         input_data = input_data[~missing_ind]
@@ -35,6 +40,21 @@ def load_clean_csv(data_path, sub_sample=False, missing_val="ignore", normalized
         input_m = np.mean(input_data,0)
         input_std = np.std(input_data, 0)
         input_data = (input_data - input_m)/input_std
+        stats["mean"] = input_m
+        stats["std"] = input_std
     
+    if return_stats:
+        return yb, input_data, ids, stats
     return yb, input_data, ids
 
+
+def apply_preprocessing(input_data, fill=None, mean=None, std=None):
+    """Apply previously computed preprocessing statistics to input_data (missing values denoted by -999)
+    fill replaces the missing values column-wise, mean and std normalize the data; None skips the step"""
+    input_data = np.array(input_data, dtype=float)
+    if fill is not None:
+        missing = (input_data == -999)
+        input_data[missing] = np.broadcast_to(fill, input_data.shape)[missing]
+    if mean is not None:
+        input_data = (input_data - mean)/std
+    return input_data
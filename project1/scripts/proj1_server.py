@@ -0,0 +1,176 @@
+# Local scoring service: serves a saved model (see proj1_model.py) over HTTP on localhost or a Unix socket.
+# Concurrent requests are micro-batched into a single vectorized build_poly_plus + predict_labels call.
+#
+# Usage: python proj1_server.py model.npz [--port 8000 | --unix /tmp/proj1.sock]
+#   POST /predict  {"inputs": [[...], ...]}  ->  {"predictions": [...]}
+#   GET  /health                             ->  {"status": "ok", "n_inputs": ..., "degree": ...}
+import argparse
+import asyncio
+import json
+import numpy as np
+from proj1_model import load_model, score_model
+
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed", 500: "Internal Server Error"}
+
+
+class MicroBatcher:
+    """Collect concurrent scoring requests and score them together.
+    A batch is closed once it holds max_batch_size rows or max_delay seconds after its first request"""
+
+    def __init__(self, model, max_batch_size=4096, max_delay=0.002):
+        self.model = model
+        self.max_batch_size = max_batch_size
+        self.max_delay = max_delay
+        self.queue = asyncio.Queue()
+        self.batch_sizes = []
+
+    async def submit(self, inputs):
+        """Queue inputs (a 2D array of raw events) and wait for their predicted labels"""
+        inputs = np.atleast_2d(np.asarray(inputs, dtype=float))
+        if inputs.ndim != 2 or inputs.shape[1] != self.model["n_inputs"]:
+            raise ValueError('Expected rows of {e} input columns'.format(e=self.model["n_inputs"]))
+        if not np.isfinite(inputs).all():
+            raise ValueError('Inputs must be finite numbers (missing values are denoted by -999)')
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((inputs, future))
+        return await future
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self.queue.get()]
+            rows = len(batch[0][0])
+            deadline = loop.time() + self.max_delay
+            while rows < self.max_batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self.queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                batch.append(item)
+                rows += len(item[0])
+
+            inputs = np.concatenate([item[0] for item in batch])
+            self.batch_sizes.append(len(inputs))
+            try:
+                # score in a worker thread so that the next batch keeps filling meanwhile
+                y_pred = await loop.run_in_executor(None, score_model, self.model, inputs)
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            start = 0
+            for item_inputs, future in batch:
+                end = start + len(item_inputs)
+                if not future.done():
+                    future.set_result(y_pred[start:end])
+                start = end
+
+
+async def read_http_message(reader):
+    """Read one HTTP/1.1 message, return (start line, headers, body) or None at end of stream"""
+    start_line = await reader.readline()
+    if not start_line:
+        return None
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    length = int(headers.get("content-length", 0))
+    if length < 0:
+        raise ValueError("negative Content-Length")
+    body = await reader.readexactly(length)
+    return start_line.decode("latin-1").strip(), headers, body
+
+
+def write_http_response(writer, status, payload):
+    body = json.dumps(payload).encode()
+    writer.write("HTTP/1.1 {s} {r}\r\nContent-Type: application/json\r\nContent-Length: {n}\r\n\r\n"
+                 .format(s=status, r=REASONS[status], n=len(body)).encode() + body)
+
+
+class ScoringServer:
+    """Asyncio HTTP server answering /predict requests through a MicroBatcher"""
+
+    def __init__(self, model, max_batch_size=4096, max_delay=0.002):
+        self.model = model
+        self.batcher = MicroBatcher(model, max_batch_size, max_delay)
+
+    async def start(self, host="127.0.0.1", port=8000, unix_path=None):
+        self.batcher_task = asyncio.ensure_future(self.batcher.run())
+        if unix_path is not None:
+            self.server = await asyncio.start_unix_server(self.handle_connection, path=unix_path)
+        else:
+            self.server = await asyncio.start_server(self.handle_connection, host, port)
+        return self.server
+
+    async def close(self):
+        self.server.close()
+        await self.server.wait_closed()
+        self.batcher_task.cancel()
+
+    async def handle_connection(self, reader, writer):
+        try:
+            while True:
+                message = await read_http_message(reader)
+                if message is None:
+                    break
+                start_line, headers, body = message
+                status, payload = await self.handle_request(start_line, body)
+                write_http_response(writer, status, payload)
+                await writer.drain()
+                if headers.get("connection", "").lower() == "close":
+                    break
+        except ValueError as e:
+            # malformed request (e.g. a bad Content-Length), answer before dropping the connection
+            write_http_response(writer, 400, {"error": "malformed request: " + str(e)})
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def handle_request(self, start_line, body):
+        method, path = (start_line.split(" ") + ["", ""])[:2]
+        if path == "/health":
+            return 200, {"status": "ok", "n_inputs": self.model["n_inputs"], "degree": self.model["degree"],
+                         "features": self.model["feature_list"].tolist()}
+        if path != "/predict":
+            return 404, {"error": "unknown path " + path}
+        if method != "POST":
+            return 405, {"error": "use POST"}
+        try:
+            inputs = json.loads(body)["inputs"]
+            y_pred = await self.batcher.submit(inputs)
+        except (ValueError, KeyError, TypeError) as e:
+            return 400, {"error": str(e)}
+        except Exception as e:
+            return 500, {"error": str(e)}
+        return 200, {"predictions": y_pred.astype(int).tolist()}
+
+
+async def serve(model_path, host, port, unix_path, max_batch_size, max_delay):
+    server = ScoringServer(load_model(model_path), max_batch_size, max_delay)
+    await server.start(host, port, unix_path)
+    print("Serving", model_path, "on", unix_path if unix_path is not None else "{h}:{p}".format(h=host, p=port))
+    await server.server.serve_forever()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve a saved model for batch scoring")
+    parser.add_argument("model", help="model file written by save_model")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--unix", default=None, help="listen on this Unix socket path instead of TCP")
+    parser.add_argument("--max-batch-size", type=int, default=4096, help="maximum number of rows per batch")
+    parser.add_argument("--max-delay-ms", type=float, default=2.0, help="maximum wait for a batch to fill")
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args.model, args.host, args.port, args.unix, args.max_batch_size, args.max_delay_ms / 1000))
+    except KeyboardInterrupt:
+        pass
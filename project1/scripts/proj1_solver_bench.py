@@ -0,0 +1,66 @@
+# Speed/accuracy benchmark of sketched_least_squares against the normal equations (least_squares, ridge_regression)
+# on build_poly_plus matrices. The error is relative to a Householder QR solution of the same problem.
+#
+# Usage: python proj1_solver_bench.py [--rows 50000] [--features 10] [--degrees 3 4] [--lambdas 0 1e-6]
+#   --scaling standardized: features as returned by load_clean_csv (zero mean, unit variance)
+#   --scaling raw:          skewed, uncentered features, as before normalization
+import argparse
+import time
+import numpy as np
+from implementations import least_squares, ridge_regression, sketched_least_squares
+from proj1_utils import build_poly_plus
+
+
+def make_features(num_row, num_feat, scaling, seed=1):
+    """Random features and labels (-1,1) that depend non-linearly on them"""
+    np.random.seed(seed)
+    x = np.random.randn(num_row, num_feat)
+    y = np.sign(x[:, 0] * x[:, 1] + x[:, 2] ** 3 - 0.5 + 0.3 * np.random.randn(num_row))
+    if scaling == "raw":
+        # heavy-tailed, positive and differently scaled columns, like momenta and masses
+        x = np.exp(0.5 * x) * np.logspace(0, 2, num_feat) + 10
+    return y, x
+
+
+def reference_solution(y, tx, lambda_):
+    """Backward stable solution of the (ridge) least squares problem by QR of the augmented matrix"""
+    damp = np.sqrt(2 * tx.shape[0] * lambda_)
+    q, r = np.linalg.qr(np.r_[tx, damp * np.identity(tx.shape[1])])
+    return np.linalg.solve(r, q.T @ np.r_[y, np.zeros(tx.shape[1])]), np.linalg.cond(r)
+
+
+def run(y, x, degree, lambda_):
+    tx = build_poly_plus(x, degree)
+    w_ref, cond = reference_solution(y, tx, lambda_)
+    if lambda_ == 0:
+        solvers = [("least_squares", lambda: least_squares(y, tx))]
+    else:
+        solvers = [("ridge_regression", lambda: ridge_regression(y, tx, lambda_))]
+    solvers.append(("sketched_least_squares", lambda: sketched_least_squares(y, tx, lambda_)))
+
+    for name, solver in solvers:
+        start = time.perf_counter()
+        try:
+            w, _ = solver()
+            error = np.linalg.norm(w - w_ref) / np.linalg.norm(w_ref)
+        except np.linalg.LinAlgError:
+            error = np.nan
+        print("{d:>6} {p:>6} {l:>8.0e} {c:>9.1e}  {n:<22} {t:>7.2f}s {e:>9.1e}".format(
+              d=degree, p=tx.shape[1], l=lambda_, c=cond, n=name, t=time.perf_counter() - start, e=error))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare least squares solvers on polynomial design matrices")
+    parser.add_argument("--rows", type=int, default=50000)
+    parser.add_argument("--features", type=int, default=10)
+    parser.add_argument("--degrees", type=int, nargs="+", default=[3, 4])
+    parser.add_argument("--lambdas", type=float, nargs="+", default=[0, 1e-6])
+    parser.add_argument("--scaling", choices=["standardized", "raw"], default="standardized")
+    args = parser.parse_args()
+
+    y, x = make_features(args.rows, args.features, args.scaling)
+    print("rows: {n}, features: {f}, scaling: {s}".format(n=args.rows, f=args.features, s=args.scaling))
+    print("degree   cols   lambda cond(tx)  solver                     time  rel.error")
+    for degree in args.degrees:
+        for lambda_ in args.lambdas:
+            run(y, x, degree, lambda_)
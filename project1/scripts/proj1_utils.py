@@ -39,19 +39,28 @@ def build_poly(x, degree):
         poly = np.c_[poly, np.power(x, deg)]
     return poly
 
+def build_poly_block(x, deg, lower_block):
+    """
+    Builds the monomial columns of exactly degree deg combining all features, given lower_block,
+    the block of degree deg-1 (a column of ones for deg=1). Columns follow the order of
+    combinations_with_replacement, each one is a column of lower_block times a feature.
+    """
+    lower_index = {c: j for j, c in enumerate(it.combinations_with_replacement(range(x.shape[1]), deg-1))}
+    combs = list(it.combinations_with_replacement(range(x.shape[1]), deg))
+    block = np.empty((len(x), len(combs)))
+    for j, c in enumerate(combs):
+        block[:, j] = lower_block[:, lower_index[c[:-1]]] * x[:, c[-1]]
+    return block
+
 def build_poly_plus(x, degree):
     """
     Builds polynomial basis function of a certain degree combining all features.
     """
-    poly = np.ones((len(x), 1))
+    blocks = [np.ones((len(x), 1))]
 
     for deg in range(1, degree+1):
-        if deg == 1:
-            poly = np.c_[poly, x]
-        else:
-            for i in it.combinations_with_replacement(range(x.shape[1]),deg):
-                poly = np.c_[poly, np.prod(x[:,i],1)]
-    return poly
+        blocks.append(build_poly_block(x, deg, blocks[-1]))
+    return np.hstack(blocks)
 
 def build_k_indices(y, k_fold, seed):
     """build k indices for k-fold."""
@@ -86,6 +95,75 @@ def find_desired_var(var_space, y, tx, k_fold, model_name, *func_args):
         
     opt_var = var_space[np.argmin(rmse_te)]
     return opt_var, rmse_tr, rmse_te
+
+
+def find_desired_degree(degrees, var_space, y, x, k_fold):
+    """Degree-search mode of find_desired_var for ridge regression: return the (degree, lambda) pair
+    with least rmse_te over degrees x var_space, along with rmse_tr and rmse_te with one row per distinct degree (in increasing order).
+    x holds the raw features, the build_poly_plus columns are added one degree block at a time and the
+    per-fold Gram matrices are extended with the new cross blocks instead of being recomputed.
+    Folds and the ridge penalty match find_desired_var(var_space, y, build_poly_plus(x, degree), k_fold, ridge_regression)"""
+    degrees = sorted(set(degrees))
+    k_indices = build_k_indices(y, k_fold, 1)
+    
+    # sort rows fold by fold so that every fold is a contiguous slice, rows left over by
+    # build_k_indices form a last group that is always part of the training set
+    rest = np.setdiff1d(np.arange(len(y)), np.concatenate(k_indices))
+    order = np.concatenate(list(k_indices) + [rest])
+    bounds = np.cumsum([0] + [len(k_indices[k]) for k in range(k_fold)] + [len(rest)])
+    groups = [slice(bounds[g], bounds[g+1]) for g in range(k_fold+1)]
+    x, y = x[order], y[order]
+    
+    n_cols = 1 + sum(len(list(it.combinations_with_replacement(range(x.shape[1]), deg)))
+                     for deg in range(1, degrees[-1]+1))
+    tx = np.empty((len(y), n_cols))
+    tx[:, :1] = 1
+    gram = np.zeros((k_fold+1, n_cols, n_cols))
+    txy = np.zeros((k_fold+1, n_cols))
+    yy = np.array([y[g].dot(y[g]) for g in groups])
+    rmse_tr = np.zeros((len(degrees), len(var_space)))
+    rmse_te = np.zeros((len(degrees), len(var_space)))
+    
+    p, p_new = 0, 1
+    for deg in range(0, degrees[-1]+1):
+        if deg > 0:
+            block = build_poly_block(x, deg, tx[:, p:p_new])
+            p, p_new = p_new, p_new + block.shape[1]
+            tx[:, p:p_new] = block
+        # bordered update: only the cross products involving the new block columns p:p_new
+        for g, rows in enumerate(groups):
+            cross = tx[rows, :p_new].T.dot(tx[rows, p:p_new])
+            gram[g, :p_new, p:p_new] = cross
+            gram[g, p:p_new, :p_new] = cross.T
+            txy[g, p:p_new] = tx[rows, p:p_new].T.dot(y[rows])
+        if deg not in degrees:
+            continue
+        
+        d = degrees.index(deg)
+        gram_all = gram[:, :p_new, :p_new].sum(0)
+        txy_all = txy[:, :p_new].sum(0)
+        rmse_tr_tmp = [[] for _ in var_space]
+        rmse_te_tmp = [[] for _ in var_space]
+        for k in range(k_fold):
+            n_tr = len(y) - len(k_indices[k])
+            gram_tr = gram_all - gram[k, :p_new, :p_new]
+            txy_tr = txy_all - txy[k, :p_new]
+            # one eigendecomposition per fold serves every lambda
+            eig_val, eig_vec = np.linalg.eigh(gram_tr)
+            c = eig_vec.T.dot(txy_tr)
+            for v, var in enumerate(var_space):
+                w = eig_vec.dot(c / (eig_val + 2 * n_tr * var))
+                # mse from the Gram matrices: |y - tx w|^2 = y.y - 2 w.tx'y + w'(tx'tx)w
+                sse_tr = yy.sum() - yy[k] - 2 * w.dot(txy_tr) + w.dot(gram_tr).dot(w)
+                sse_te = yy[k] - 2 * w.dot(txy[k, :p_new]) + w.dot(gram[k, :p_new, :p_new]).dot(w)
+                rmse_tr_tmp[v].append(sse_tr / (2 * n_tr))
+                rmse_te_tmp[v].append(sse_te / (2 * len(k_indices[k])))
+        for v in range(len(var_space)):
+            rmse_tr[d, v] = np.mean(np.sqrt(2*rmse_tr_tmp[v]))
+            rmse_te[d, v] = np.mean(np.sqrt(2*rmse_te_tmp[v]))
+    
+    d, v = np.unravel_index(np.argmin(rmse_te), rmse_te.shape)
+    return degrees[d], var_space[v], rmse_tr, rmse_te
       
     
 def find_weight(y, tx, k_fold, model_name, *func_args): 
@@ -150,6 +228,44 @@ def batch_iter(y, tx, batch_size, num_batches=1, shuffle=True):
             yield shuffled_y[start_index:end_index], shuffled_tx[start_index:end_index]
             
             
+def sparse_sign_sketch(tx, sketch_size, nnz_per_col=2, seed=1, chunk_bytes=2**22):
+    """
+    Compute S @ tx for a random sparse sign embedding S of shape (sketch_size, len(tx)):
+    every row of tx is added to nnz_per_col random rows of the sketch with a random sign, scaled by 1/sqrt(nnz_per_col).
+    tx is read once, in row chunks of about chunk_bytes: the rows of a chunk are sent to distinct random rows
+    of the sketch, so each chunk is a single in-place scatter-add and no copy of tx is made.
+    """
+    np.random.seed(seed)
+    num_row, num_col = tx.shape
+    chunk = int(min(sketch_size, max(1, chunk_bytes // (8 * num_col))))
+    sketch = np.zeros((sketch_size, num_col))
+    for start in range(0, num_row, chunk):
+        block = tx[start:start + chunk]
+        for _ in range(nnz_per_col):
+            rows = np.random.permutation(sketch_size)[:len(block)]
+            signs = np.random.choice([-1.0, 1.0], len(block))
+            sketch[rows] += signs[:, None] * block
+    return sketch / np.sqrt(nnz_per_col)
+
+
+def solve_triangular(r, b, trans=False, block_size=64):
+    """
+    Solve r @ x = b (or r.T @ x = b if trans) for an upper triangular r by block back substitution,
+    without forming the inverse of r. numpy has no triangular solver, the diagonal blocks use np.linalg.solve.
+    """
+    n = r.shape[0]
+    if n <= block_size:
+        return np.linalg.solve(r.T if trans else r, b)
+    h = n // 2
+    if trans:
+        x1 = solve_triangular(r[:h, :h], b[:h], trans, block_size)
+        x2 = solve_triangular(r[h:, h:], b[h:] - r[:h, h:].T @ x1, trans, block_size)
+    else:
+        x2 = solve_triangular(r[h:, h:], b[h:], trans, block_size)
+        x1 = solve_triangular(r[:h, :h], b[:h] - r[:h, h:] @ x2, trans, block_size)
+    return np.concatenate((x1, x2))
+            
+            
 def compute_score(y_test, y_pred):
     if len(y_pred)== len(y_test):
         ones_aux = np.ones(len(y_pred))
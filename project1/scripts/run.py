@@ -3,48 +3,52 @@ from proj1_helpers import *
 from implementations import *
 # from proj1_plot_helpers import *
 from proj1_feature_selection import *
+from proj1_model import save_model, load_model, score_model
 
 
 # A helper function that loads the data, fills in the missing values with average,
 # and normalize data
-print("1/8: Prepare to load data")
-y, inputs, ids = load_clean_csv("train.csv", sub_sample=False, missing_val="avg", normalized="True")
-print("2/8: Data preprocessing finished")
+print("1/9: Prepare to load data")
+y, inputs, ids, stats = load_clean_csv("train.csv", sub_sample=False, missing_val="avg", normalized="True", return_stats=True)
+print("2/9: Data preprocessing finished")
 # Apply stepwise regression for feature selection
 feature_list, scores = stepwise_regression(inputs,y)
-print("3/8: Feature selection finished")
+print("3/9: Feature selection finished")
 # Select only the 10 best features and sort it by name
 feature_list=feature_list[:10]
 feature_list.sort()
 
 # Focus on selected features
 x = inputs[:, feature_list]
-degree = 3
+degrees = range(1, 5)
 k_fold = 4
 
-# Build polynomial model of the given degree. Different combinations are also considered
-tx = build_poly_plus(x, degree)
-print("4/8: Building polynomial model finished")
-# Find an optimal lambda (with least rmse) from a specified space using grid search
+# Find an optimal (degree, lambda) pair (with least rmse) from a specified space using grid search.
+# The polynomial columns are built one degree at a time and reused across degrees
 lambdas = np.logspace(-5, 0, 30)
-opt_lambda, rmse_tr, rmse_te = find_desired_var(lambdas, y, tx, k_fold, ridge_regression)
-print("5/8: Finding lambda for ridge regression finished")
+degree, opt_lambda, rmse_tr, rmse_te = find_desired_degree(degrees, lambdas, y, x, k_fold)
+print("4/9: Finding degree and lambda for ridge regression finished")
+# Build polynomial model of the selected degree. Different combinations are also considered
+tx = build_poly_plus(x, degree)
+print("5/9: Building polynomial model finished")
 # find_weight applies cross validation by splitting data k_fold and
 # the final weight matrix is the average over matrices that result in
 # least rmse for each run
 w, mse = find_weight(y, tx, k_fold, ridge_regression, opt_lambda)
 # compute_score(y_test, y_pred)
-print("6/8: Finding weight vector finished")
-# Load, clean, and normalize testing data
-y_test, inputs_test, ids_test = load_clean_csv('test.csv', False, "avg", True)
-# Build model using the same feature list
-tx_test = build_poly_plus(inputs_test[:,feature_list], degree)
-# Apply the trained label over the test data
-y_pred = predict_labels(w, tx_test)
-print("7/8: Prediction over test set finished")
+print("6/9: Finding weight vector finished")
+# Save the model (weights, features, degree and preprocessing statistics) for later scoring
+save_model("model.npz", w, feature_list, degree, stats, inputs.shape[1])
+print("7/9: Saving model finished")
+# Load the raw testing data
+y_test, inputs_test, ids_test = load_csv_data('test.csv')
+# Apply the saved model: the test data is cleaned and normalized with the training statistics,
+# so the submission is exactly what the scoring service returns for the same events
+y_pred = score_model(load_model("model.npz"), inputs_test)
+print("8/9: Prediction over test set finished")
 # Create submission
 create_csv_submission(ids_test, y_pred, "prediction.csv")
-print("8/8: Creating submission file finished")
+print("9/9: Creating submission file finished")
 
 # Optional (Supplementary for data used in report)
 # ================